@@ -1,6 +1,7 @@
 from .collector import run as collector
 from .location_inference  import run as location_inference
 from .filter    import run as filter
+from .sampler   import run as sampler
 from .sentiment5 import run as sentiment5
 from .sentiment3 import run as sentiment3
 from .topics    import run as topics
@@ -1,7 +1,24 @@
 # agents/collector.py  (now supports --file-path)
-import json, csv, time, logging
+import csv, time, logging
 from pathlib import Path
 import pandas as pd
+from ..utils.loader import load_jsonl
+
+AIRLINE_COLS = ["tweet_id", "name", "tweet_created", "text",
+                "tweet_location", "airline_sentiment"]
+REDDIT_FIELDS = {
+    "post_id"  : (("id",),),
+    "user_id"  : (("author",),),
+    "timestamp": (("created_utc",),),
+    "content"  : (("body",),),
+    "location" : (("subreddit",),),
+}
+GEOCOV_FIELDS = {
+    "post_id"  : (("id",),),
+    "timestamp": (("created_at",),),
+    "content"  : (("text",),),
+    "location" : (("place", "country_code"), ("country_code",)),
+}
 
 def _map_airline(df):
     return pd.DataFrame({
@@ -13,29 +30,12 @@ def _map_airline(df):
         "label"    : df.get("airline_sentiment")
     })
 
-def _map_reddit(jsl):
-    rows = []
-    for raw in jsl:
-        rows.append({
-            "post_id"  : raw["id"],
-            "user_id"  : raw.get("author"),
-            "timestamp": pd.to_datetime(raw["created_utc"], unit="s", utc=True),
-            "content"  : raw["body"],
-            "location" : raw.get("subreddit")
-        })
-    return pd.DataFrame(rows)
+def _map_reddit(df):
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", utc=True)
+    return df
 
-def _map_geocov(jsl):
-    rows = []
-    for raw in jsl:
-        cc = (raw.get("place") or {}).get("country_code") or raw.get("country_code")
-        rows.append({
-            "post_id"  : raw["id"],
-            "timestamp": raw["created_at"],
-            "content"  : raw["text"],
-            "location" : cc
-        })
-    return pd.DataFrame(rows)
+def _map_geocov(df):
+    return df                                  # columns already built by GEOCOV_FIELDS
 
 MAPPERS = {"airline": _map_airline, "reddit": _map_reddit, "geocov19": _map_geocov}
 
@@ -49,13 +49,12 @@ def run(context: dict) -> dict:
 
     dtype = cfg.get("dataset_type") or Path(fp).stem.lower()
     if "airline" in dtype:
-        df = _map_airline(pd.read_csv(fp))
+        df = _map_airline(pd.read_csv(
+            fp, usecols=lambda c: c in AIRLINE_COLS, nrows=cfg.get("max_rows")))
     elif "reddit" in dtype:
-        df_raw = [json.loads(l) for l in Path(fp).open()]
-        df = _map_reddit(df_raw)
+        df = _map_reddit(load_jsonl(fp, REDDIT_FIELDS, max_rows=cfg.get("max_rows")))
     elif "geocov" in dtype:
-        df_raw = [json.loads(l) for l in Path(fp).open()]
-        df = _map_geocov(df_raw)
+        df = _map_geocov(load_jsonl(fp, GEOCOV_FIELDS, max_rows=cfg.get("max_rows")))
     else:
         raise ValueError(f"Unrecognised dataset-type {dtype}")
 
@@ -1,29 +1,46 @@
 # agents/merge.py
 """
 Idempotent merge node – waits until both sentiment_df & topics_df exist,
-then merges them with filtered_posts → merged_df.
+then merges them with filtered_posts → data/merged.csv.
+
+The report reads the streaming accumulators, so the joined frame is written
+in chunks and not kept; only --sample (sample-sized) keeps it as merged_df
+for the reporter's bootstrap.
 """
 import logging
 from pathlib import Path
 import pandas as pd
 
+CHUNK = 50_000
+
+def _join(base: pd.DataFrame, rights) -> pd.DataFrame:
+    for r in rights:
+        base = base.join(r, on="post_id")
+    return base
+
 def run(state: dict) -> dict | None:
     # Wait until prerequisites are available
     if not all(k in state for k in ("filtered_posts", "sent5", "sent3", "topics")):
         return None
 
-    base = pd.DataFrame(state["filtered_posts"])
-    df = (
-        base.merge(state["sent5"],  on="post_id", how="left")
-            .merge(state["sent3"],  on="post_id", how="left")
-            .merge(state["topics"], on="post_id", how="left")
-    )
-
+    rows   = state["filtered_posts"]
+    rights = [state[k].set_index("post_id") for k in ("sent5", "sent3", "topics")]
     Path("data").mkdir(exist_ok=True)
-    df.to_csv("data/merged.csv", index=False)
-    logging.info("Merge: %d rows", len(df))
-
-    # keep everything and add merged_df so downstream nodes still see 'config'
     new_state = state.copy()
-    new_state["merged_df"] = df
+
+    if state["config"].get("sample"):
+        df = _join(pd.DataFrame(rows), rights)
+        if state.get("sample_merged") is not None:     # earlier --sample rounds
+            df = pd.concat([state["sample_merged"], df], ignore_index=True)
+        df.to_csv("data/merged.csv", index=False)
+        new_state["merged_df"] = df
+        n = len(df)
+    else:
+        n = 0
+        for i in range(0, len(rows), CHUNK):
+            part = _join(pd.DataFrame(rows[i : i + CHUNK]), rights)
+            part.to_csv("data/merged.csv", index=False, mode="w" if i == 0 else "a", header=i == 0)
+            n += len(part)
+
+    logging.info("Merge: %d rows", n)
     return new_state
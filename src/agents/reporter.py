@@ -1,14 +1,19 @@
 # agents/reporter.py
 """
 Final contextual Markdown report – runs after merge.
+Metrics come from the streaming accumulators in state["agg"] (plus any
+--agg-from shards, loaded by the CLI); the merged frame only exists for
+--sample bootstraps.
 """
 # reporter.py – adds macro P/R/F1 comparison
 from __future__ import annotations
 import json, logging, time
-from collections import Counter
 from pathlib import Path
 import pandas as pd
 from ..llm_abstraction import get_client
+from ..utils.stats import bootstrap_ci, wilson
+from ..utils.accumulators import ReportAccumulator
+from .sampler import strata_of
 
 PROMPT_TMPL = Path("prompts/agent3.txt").read_text()
 
@@ -29,55 +34,78 @@ def _macro(y_true: pd.Series, y_pred: pd.Series) -> dict:
             "f1":        round(f1/n,3)}
 
 def run(state: dict) -> dict | None:
-    if "merged_df" not in state:
+    if "agg" not in state:
         return None
 
-    df  = state["merged_df"]
     cfg = state["config"]
     llm = get_client(cfg["model"])
-
-    # ground truth & predictions
-    gt      = df["label"].str.lower()
-    mapped5 = df["score5"].map({-2:"negative",-1:"negative",0:"neutral",1:"positive",2:"positive"})
-    pred3   = df["score3"]
+    agg = ReportAccumulator().merge(state["agg"])
+    if state.get("agg_prior") is not None:
+        agg.merge(state["agg_prior"])
 
     overall = {
-        "macro_5pt": _macro(gt, mapped5),
-        "macro_3pt": _macro(gt, pred3),
+        "macro_5pt": agg.macro("5pt"),
+        "macro_3pt": agg.macro("3pt"),
     }
+    for key, scheme in (("cascade_5pt", "5pt"), ("cascade_3pt", "3pt")):
+        stats = agg.cascade(scheme)
+        if stats:
+            overall[key] = stats
+
+    # ── --sample: bootstrap intervals; maybe ask the sampler for more ──────
+    total = agg.n_posts
+    if cfg.get("sample") and "merged_df" in state:
+        df     = state["merged_df"]
+        n_pop  = len(state.get("population", df))
+        rounds = state.get("sample_round", 1)
+        overall["sample"] = {"n": len(df), "population": n_pop, "rounds": rounds}
+        total  = f"{len(df)} (location-stratified sample of {n_pop})"
+        if "label" not in df or not agg.hits("3pt")[1]:
+            logging.warning("Sample intervals need ground-truth labels; none in this dataset")
+        else:
+            gt      = df["label"].str.lower()
+            mapped5 = df["score5"].map({-2:"negative",-1:"negative",0:"neutral",1:"positive",2:"positive"})
+            strata  = strata_of(df["location_inferred"], state.get("sample_strata", []))
+            ci = {"macro_5pt_ci": bootstrap_ci(_macro, (gt, mapped5),      strata),
+                  "macro_3pt_ci": bootstrap_ci(_macro, (gt, df["score3"]), strata)}
+            widest = max((hi - lo) / 2 for c in ci.values() for lo, hi in c.values())
+            if (cfg.get("sample_grow") and widest > float(cfg.get("sample_margin") or 0.05)
+                    and rounds < int(cfg.get("sample_max_rounds") or 4) and len(df) < n_pop):
+                logging.info("Sample CI ±%.3f too wide after round %d; growing", widest, rounds)
+                new_state = state.copy()
+                new_state["sample_more"] = True
+                return new_state
+            overall.update(ci)
+            overall["sample"]["max_ci_halfwidth"] = round(widest, 3)
 
     # ── per-location metrics ────────────────────────────────────────────────
     loc_rows = []
-    for loc, grp in df.groupby("location_inferred"):
-        gt_loc   = grp["label"].str.lower()
-        m5_loc   = grp["score5"].map({-2:"negative",-1:"negative",0:"neutral",1:"positive",2:"positive"})
-        p3_loc   = grp["score3"]
-        loc_rows.append({
+    for loc in agg.locations():
+        row = {
             "location": loc,
-            **{f"{k}_5pt": v for k,v in _macro(gt_loc, m5_loc).items()},
-            **{f"{k}_3pt": v for k,v in _macro(gt_loc, p3_loc).items()},
-        })
-    loc_df = pd.DataFrame(loc_rows).sort_values("location")
+            **{f"{k}_5pt": v for k,v in agg.macro("5pt", loc).items()},
+            **{f"{k}_3pt": v for k,v in agg.macro("3pt", loc).items()},
+        }
+        if cfg.get("sample"):
+            hits, n_lab = agg.hits("3pt", loc)
+            row["n"] = n_lab
+            row["acc_3pt_lo"], row["acc_3pt_hi"] = wilson(hits, n_lab)
+        loc_rows.append(row)
+    loc_df = pd.DataFrame(loc_rows)
 
     # top topics for context
-    def _iter_topics(series):
-        for item in series:
-            if isinstance(item, list):
-                yield from item
-            else:
-                continue
-
-    top_topics = Counter(_iter_topics(df["topics"])).most_common(10)
+    top_topics = agg.topics.most_common(10)
 
     # build Markdown comparison table
     table_md = loc_df.to_markdown(index=False, floatfmt=".3f")
 
     prompt = PROMPT_TMPL.format(
-        total_posts=len(df),
+        total_posts=total,
         sentiment_json=json.dumps(overall),
         top_topics_json=json.dumps(top_topics),
         demo_json=table_md,           # embed the table
-        threshold_note="n/a",
+        threshold_note=(f"cascade: {cfg['cascade_model']} below p={cfg.get('cascade_threshold')} escalated to {cfg['model']}"
+                        if cfg.get("cascade_model") else "n/a"),
     )
 
     tic = time.perf_counter()
@@ -90,4 +118,5 @@ def run(state: dict) -> dict | None:
 
     new_state = state.copy()
     new_state["report_path"] = report_path
+    new_state.pop("sample_more", None)
     return new_state
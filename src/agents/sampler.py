@@ -0,0 +1,72 @@
+# agents/sampler.py
+"""
+Location-stratified sampling between filter and the annotators (--sample).
+
+First pass: size the sample from --sample-margin and draw it with
+proportional allocation over location_inferred, so the sample is
+self-weighting. Locations too small to earn one post at the current size
+are pooled into an "Other" stratum, so free-text locations cannot inflate
+the sample beyond what the margin asks for. When the reporter asks for
+more (--sample-grow), the previous round's merged rows are set aside and
+the target is doubled; only the new rows are annotated.
+"""
+from __future__ import annotations
+import logging, time
+import pandas as pd
+from ..utils.stats import sample_size
+
+STRATUM, OTHER = "location_inferred", "Other"
+
+def _collapse(locs: pd.Series, n: int) -> list:
+    """Locations whose proportional share of an n-post sample is at least one post."""
+    sizes = locs.value_counts()
+    return list(sizes[sizes * n / len(locs) >= 1].index)
+
+def strata_of(locs: pd.Series, major) -> pd.Series:
+    locs = locs.fillna("Unknown")
+    return locs.where(locs.isin(major), OTHER)
+
+def _allocate(sizes: pd.Series, n: int) -> pd.Series:
+    alloc = (sizes * n / sizes.sum()).round().clip(lower=1).astype(int)
+    return alloc.clip(upper=sizes)
+
+def run(state: dict) -> dict:
+    cfg = state["config"]
+    if not cfg.get("sample"):
+        return state
+    tic = time.perf_counter()
+
+    new_state = state.copy()
+    if "population" not in new_state:
+        new_state["population"] = state["filtered_posts"]
+    pop    = pd.DataFrame(new_state["population"])
+    locs   = pop[STRATUM].fillna("Unknown") if STRATUM in pop else pd.Series("Unknown", index=pop.index)
+    taken  = set(new_state.get("sample_ids", []))
+    rnd    = new_state.get("sample_round", 0) + 1
+
+    if "merged_df" in new_state:                 # re-entry from the reporter
+        # merge already folded earlier rounds in, so merged_df is cumulative
+        new_state["sample_merged"] = new_state.pop("merged_df")
+
+    target = (sample_size(len(pop), float(cfg.get("sample_margin") or 0.05))
+              if rnd == 1 else min(len(pop), 2 * len(taken)))
+    major  = _collapse(locs, target)
+    strata = strata_of(locs, major)
+    alloc  = _allocate(strata.value_counts(), target)
+
+    picked = []
+    for loc, want in alloc.items():
+        grp  = pop[(strata == loc) & ~pop["post_id"].isin(taken)]
+        need = want - (len(strata[strata == loc]) - len(grp))
+        if need > 0:
+            picked.append(grp.sample(n=min(need, len(grp)), random_state=rnd))
+    sample = pd.concat(picked) if picked else pop.iloc[0:0]
+
+    new_state["filtered_posts"] = sample.to_dict("records")
+    new_state["sample_ids"]     = sorted(taken | set(sample["post_id"]))
+    new_state["sample_round"]   = rnd
+    new_state["sample_strata"]  = major
+    logging.info("Sampler round %d: +%d posts (%d/%d sampled, %.2fs)",
+                 rnd, len(sample), len(new_state["sample_ids"]), len(pop),
+                 time.perf_counter() - tic)
+    return new_state
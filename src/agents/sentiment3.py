@@ -3,8 +3,10 @@ from __future__ import annotations
 import json, logging, time
 from pathlib import Path
 import pandas as pd
-from ..llm_abstraction import get_client
+from ..llm_abstraction import get_client, HFClient
 from ..utils.json_utils import safe_extract
+from ..utils.accumulators import ReportAccumulator
+from .sentiment5 import local_preds
 
 PROMPT_TMPL = Path("prompts/agent1b.txt").read_text()
 MAP_3 = {-1: "negative", 0: "neutral", 1: "positive"}
@@ -45,13 +47,39 @@ def _run_openai(rows, llm, batch):
     return [{"post_id": d["post_id"], "score3": d.get("label", "neutral").lower()}
             for d in results]
 
+def _run_cascade(rows, preds, llm, batch, threshold):
+    """Local predictions for every post; only those below `threshold` go to the LLM."""
+    out, unsure = [], []
+    for r in rows:
+        score, prob = preds[r["post_id"]]
+        if isinstance(score, int) and prob >= threshold:
+            out.append({"post_id": r["post_id"], "score3": MAP_3[max(-1, min(1, score))],
+                        "conf3": prob, "tier3": "local"})
+        else:
+            unsure.append((r, prob))
+    if unsure:
+        conf = {r["post_id"]: prob for r, prob in unsure}
+        out.extend({**d, "conf3": conf.get(d["post_id"]), "tier3": "llm"}
+                   for d in _run_openai([r for r, _ in unsure], llm, batch))
+    logging.info("Sentiment-3 cascade escalated %d/%d posts", len(unsure), len(rows))
+    return out
+
 def run(state: dict) -> dict:
     rows  = state["filtered_posts"]
     cfg   = state["config"]
     llm   = get_client(cfg["model"])
     tic   = time.perf_counter()
 
-    if getattr(llm, "name", "") == "hf-sentiment":
+    if cfg.get("cascade_model"):
+        batch = int(cfg.get("batch_size", 1)) or 1
+        local = get_client(cfg["cascade_model"])
+        if not isinstance(local, HFClient):
+            raise ValueError(f"--cascade-model must be a local HF alias, got '{cfg['cascade_model']}'")
+        # reuse sentiment5's pass; only classify posts it did not see
+        preds = local_preds(rows, local, state.get("local_preds"))
+        out   = _run_cascade(rows, preds, llm, batch,
+                             float(cfg.get("cascade_threshold", 0.9)))
+    elif getattr(llm, "name", "") == "hf-sentiment":
         out = _run_hf(rows, llm)
     else:
         batch = int(cfg.get("batch_size", 1)) or 1
@@ -62,6 +90,16 @@ def run(state: dict) -> dict:
     df.to_csv("data/sentiment3.csv", index=False)
     logging.info("Sentiment-3 done (%d rows, %.2fs)", len(df), time.perf_counter()-tic)
 
+    # fold into the report accumulators (per-location confusion counts)
+    agg  = state.get("agg") or ReportAccumulator()
+    pred = {d["post_id"]: d for d in out}
+    for r in rows:
+        d = pred.get(r["post_id"], {})
+        agg.observe("3pt", r.get("location_inferred"), r.get("label"),
+                    d.get("score3"), d.get("tier3"))
+    agg.save("data/agg.json")
+
     new_state = state.copy()
     new_state["sent3"] = df
+    new_state["agg"]   = agg
     return new_state
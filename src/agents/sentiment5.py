@@ -7,10 +7,12 @@ from __future__ import annotations
 import json, logging, time
 from pathlib import Path
 import pandas as pd
-from ..llm_abstraction import get_client
+from ..llm_abstraction import get_client, HFClient
 from ..utils.json_utils import safe_extract
+from ..utils.accumulators import ReportAccumulator
 
 PROMPT_TMPL = Path("prompts/agent1.txt").read_text()
+MAP_5_TO_3  = {-2: "negative", -1: "negative", 0: "neutral", 1: "positive", 2: "positive"}
 
 def _run_hf(rows, llm):
     scored = []
@@ -46,13 +48,65 @@ def _run_openai(rows, llm, batch):
     # rename "score"→"score5"
     return [{"post_id": d["post_id"], "score5": int(d["score"])} for d in out]
 
+def local_preds(rows, local, cache=None) -> dict:
+    """
+    post_id → (score, prob) from the local classifier, computed only for posts
+    missing from `cache`. Posts it cannot score get (None, 0.0) so the
+    cascade escalates them.
+    """
+    cache = dict(cache or {})
+    todo  = [r for r in rows if r["post_id"] not in cache]
+    texts = [r for r in todo if isinstance(r.get("content"), str) and r["content"]]
+    cache.update((r["post_id"], (None, 0.0)) for r in todo)
+    if not texts:
+        return cache
+    try:
+        preds = local.classify([r["content"] for r in texts])
+    except Exception as e:
+        logging.warning("Local classifier batch fail (%s); retrying per post", e)
+        preds = []
+        for r in texts:
+            try:
+                preds.extend(local.classify([r["content"]]))
+            except Exception as e:
+                logging.warning("Local classifier fail %s – %s", r["post_id"], e)
+                preds.append((None, 0.0))
+    cache.update((r["post_id"], p) for r, p in zip(texts, preds))
+    return cache
+
+def _run_cascade(rows, preds, llm, batch, threshold):
+    """Local predictions for every post; only those below `threshold` go to the LLM."""
+    out, unsure = [], []
+    for r in rows:
+        score, prob = preds[r["post_id"]]
+        if isinstance(score, int) and prob >= threshold:
+            out.append({"post_id": r["post_id"], "score5": score,
+                        "conf5": prob, "tier5": "local"})
+        else:
+            unsure.append((r, prob))
+    if unsure:
+        conf = {r["post_id"]: prob for r, prob in unsure}
+        out.extend({**d, "conf5": conf.get(d["post_id"]), "tier5": "llm"}
+                   for d in _run_openai([r for r, _ in unsure], llm, batch))
+    logging.info("Sentiment-5 cascade escalated %d/%d posts", len(unsure), len(rows))
+    return out
+
 def run(state: dict) -> dict:
     rows  = state["filtered_posts"]
     cfg   = state["config"]
     llm   = get_client(cfg["model"])
     tic   = time.perf_counter()
 
-    if getattr(llm, "name", "") == "hf-sentiment":
+    if cfg.get("cascade_model"):
+        batch = int(cfg.get("batch_size", 1)) or 1
+        local = get_client(cfg["cascade_model"])
+        if not isinstance(local, HFClient):
+            raise ValueError(f"--cascade-model must be a local HF alias, got '{cfg['cascade_model']}'")
+        # one forward pass per post; sentiment3 reuses these predictions
+        preds = local_preds(rows, local, state.get("local_preds"))
+        out   = _run_cascade(rows, preds, llm, batch,
+                             float(cfg.get("cascade_threshold", 0.9)))
+    elif getattr(llm, "name", "") == "hf-sentiment":
         out = _run_hf(rows, llm)
     else:
         batch = int(cfg.get("batch_size", 1)) or 1
@@ -63,6 +117,18 @@ def run(state: dict) -> dict:
     df.to_csv("data/sentiment5.csv", index=False)
     logging.info("Sentiment-5 done (%d rows, %.2fs)", len(df), time.perf_counter()-tic)
 
+    # fold into the report accumulators (per-location confusion counts)
+    agg  = state.get("agg") or ReportAccumulator()
+    pred = {d["post_id"]: d for d in out}
+    for r in rows:
+        d = pred.get(r["post_id"], {})
+        agg.observe("5pt", r.get("location_inferred"), r.get("label"),
+                    MAP_5_TO_3.get(d.get("score5")), d.get("tier5"))
+    agg.save("data/agg.json")
+
     new_state = state.copy()
     new_state["sent5"] = df
+    new_state["agg"]   = agg
+    if cfg.get("cascade_model"):
+        new_state["local_preds"] = preds
     return new_state
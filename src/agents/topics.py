@@ -6,6 +6,10 @@ Agent 2 – batched topic-extraction
 
 Batch size is taken from cfg["batch_size"] (default 1 = legacy behaviour).
 Prompt template must contain the literal token {{posts_json}}.
+
+cfg["topic_engine"] == "cluster" instead vectorises posts with TF-IDF,
+groups them with mini-batch k-means and asks the LLM once per cluster
+(on its posts nearest the centroid); members inherit the cluster topics.
 """
 
 from __future__ import annotations
@@ -14,8 +18,11 @@ from pathlib import Path
 import pandas as pd
 from ..llm_abstraction import get_client
 from ..utils.json_utils import safe_extract
+from ..utils.accumulators import ReportAccumulator
 
-PROMPT_TMPL = Path("prompts/agent2.txt").read_text()
+PROMPT_TMPL   = Path("prompts/agent2.txt").read_text()
+CLUSTER_TMPL  = Path("prompts/agent2_cluster.txt").read_text()
+N_SAMPLES, N_KEYWORDS = 8, 10
 
 def _norm(rec, post_id):
     topics = rec.get("topics") if isinstance(rec, dict) else []
@@ -23,13 +30,8 @@ def _norm(rec, post_id):
         topics = []
     return {"post_id": post_id, "topics": topics}
 
-def run(state: dict) -> dict:
-    rows  = state["filtered_posts"]
-    cfg   = state["config"]
-    batch = int(cfg.get("batch_size", 1)) or 1
-    llm   = get_client(cfg["model"])
-
-    out, tic = [], time.perf_counter()
+def _run_llm(rows, llm, batch):
+    out = []
     for i in range(0, len(rows), batch):
         chunk  = rows[i : i + batch]
         prompt = PROMPT_TMPL.replace("{{posts_json}}", json.dumps(chunk))
@@ -39,12 +41,77 @@ def run(state: dict) -> dict:
         except Exception as e:
             logging.warning("Topics batch error (%s); default []", e)
             out.extend({"post_id": c["post_id"], "topics": []} for c in chunk)
+    return out
+
+def _run_cluster(rows, llm, k=None):
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.metrics.pairwise import euclidean_distances
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    n = len(rows)
+    if n == 0:
+        return []
+    k = min(int(k) if k else min(max(2, round((n / 2) ** 0.5)), 50), n)
+    try:
+        vec = TfidfVectorizer(max_features=20000, stop_words="english",
+                              sublinear_tf=True, min_df=2 if n >= 100 else 1)
+        X   = vec.fit_transform([r.get("content") or "" for r in rows])
+    except ValueError as e:                      # empty vocabulary
+        logging.warning("Topic clustering skipped (%s); default []", e)
+        return [{"post_id": r["post_id"], "topics": []} for r in rows]
+
+    km    = MiniBatchKMeans(n_clusters=k, random_state=0, n_init=3,
+                            batch_size=min(1024, n)).fit(X)
+    terms = vec.get_feature_names_out()
+
+    labels = {}
+    for c in range(k):
+        members = (km.labels_ == c).nonzero()[0]
+        if not len(members):
+            continue
+        # distances for this cluster's members only – no dense n × k matrix
+        dist     = euclidean_distances(X[members], km.cluster_centers_[c : c + 1]).ravel()
+        reps     = members[dist.argsort()[:N_SAMPLES]]
+        keywords = [terms[j] for j in km.cluster_centers_[c].argsort()[::-1][:N_KEYWORDS]]
+        sample   = [{"post_id": rows[j]["post_id"], "text": rows[j].get("content", "")}
+                    for j in reps]
+        prompt = (CLUSTER_TMPL.replace("{{keywords}}", ", ".join(keywords))
+                              .replace("{{posts_json}}", json.dumps(sample)))
+        try:
+            labels[c] = _norm(safe_extract(llm.generate(prompt, temperature=0.3)), None)["topics"]
+        except Exception as e:
+            logging.warning("Cluster %d label error (%s); using keywords", c, e)
+            labels[c] = []
+        if not labels[c]:                         # unparseable or wrong JSON shape
+            labels[c] = keywords[:3]
+    logging.info("Topics: %d posts → %d clusters (%d LLM calls)", n, k, len(labels))
+
+    return [{"post_id": r["post_id"], "topics": labels.get(c, []), "topic_cluster": int(c)}
+            for r, c in zip(rows, km.labels_)]
+
+def run(state: dict) -> dict:
+    rows  = state["filtered_posts"]
+    cfg   = state["config"]
+    batch = int(cfg.get("batch_size", 1)) or 1
+    llm   = get_client(cfg["model"])
+
+    tic = time.perf_counter()
+    if cfg.get("topic_engine") == "cluster":
+        out = _run_cluster(rows, llm, cfg.get("topic_clusters"))
+    else:
+        out = _run_llm(rows, llm, batch)
 
     df = pd.DataFrame(out)
     Path("data").mkdir(exist_ok=True)
     df.to_csv("data/topics.csv", index=False)
     logging.info("Topics done (%d rows, %.2fs)", len(df), time.perf_counter() - tic)
 
+    agg = state.get("agg") or ReportAccumulator()
+    for r in out:
+        agg.observe_topics(r["topics"])
+    agg.save("data/agg.json")
+
     new_state = state.copy()
     new_state["topics"] = df
+    new_state["agg"]    = agg
     return new_state
@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 load_dotenv()    
 
 from .graph import build_graph
+from .utils.accumulators import ReportAccumulator
 
 @click.command()
 @click.option("--query", required=False, help="Free-text query (ignored if --file-path).")
@@ -20,13 +21,34 @@ from .graph import build_graph
     show_default=True,
     help="Posts per LLM call for sentiment/topic agents.",
 )
+@click.option("--cascade-model", default=None,
+              help="Local HF alias (e.g. 'local') scoring every post first; --model only sees uncertain ones.")
+@click.option("--cascade-threshold", default=0.9, type=float, show_default=True,
+              help="Local-classifier probability below which a post is escalated to --model.")
+@click.option("--topic-engine", type=click.Choice(["llm", "cluster"]), default="llm", show_default=True,
+              help="'cluster': TF-IDF + k-means, one LLM call per cluster instead of per post.")
+@click.option("--topic-clusters", default=None, type=int, help="Cluster count for --topic-engine cluster (default ~sqrt(n/2)).")
+@click.option("--sample", is_flag=True, help="Annotate a location-stratified sample instead of every post.")
+@click.option("--sample-margin", default=0.05, type=float, show_default=True,
+              help="Target 95% CI half-width used to size the sample (and to stop --sample-grow).")
+@click.option("--sample-grow", is_flag=True, help="Double the sample until macro P/R/F1 intervals are within --sample-margin.")
+@click.option("--sample-max-rounds", default=4, type=int, show_default=True, help="Cap on --sample-grow rounds.")
+@click.option("--agg-from", multiple=True, type=click.Path(exists=True),
+              help="Saved report accumulators (agg.json) from other shards / earlier runs to fold in; read before this run overwrites data/agg.json.")
 def run(**kwargs):
     logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
     ctx = {"config": {**kwargs,
                       "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY"),
                       "TWITTER_BEARER": os.getenv("TWITTER_BEARER")}}
+    if kwargs["agg_from"]:
+        # load now – annotators rewrite data/agg.json during the run
+        prior = ReportAccumulator()
+        for path in kwargs["agg_from"]:
+            prior.merge(ReportAccumulator.load(path))
+        ctx["agg_prior"] = prior
     graph = build_graph()
-    graph.invoke(ctx)
+    # each --sample-grow round re-runs sampler → … → report
+    graph.invoke(ctx, {"recursion_limit": 25 + 8 * kwargs["sample_max_rounds"]})
 
 if __name__ == "__main__":
     run()  # pylint: disable=no-value-for-parameter
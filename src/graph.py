@@ -1,7 +1,7 @@
 #  Build a fan-out / fan-in graph with LangGraph’s StateGraph builder.
-from langgraph.graph import StateGraph
+from langgraph.graph import StateGraph, END
 from .agents import (
-    collector, location_inference, filter,
+    collector, location_inference, filter, sampler,
     sentiment5, sentiment3, topics,
     merge, reporter
 )
@@ -12,6 +12,7 @@ def build_graph():
     g.add_node("collector",          collector)
     g.add_node("location_inference", location_inference)
     g.add_node("filter",             filter)
+    g.add_node("sampler",            sampler)
     g.add_node("sentiment5",         sentiment5)
     g.add_node("sentiment3",         sentiment3)
     g.add_node("topics",             topics)
@@ -20,11 +21,14 @@ def build_graph():
 
     g.add_edge("collector",          "location_inference")
     g.add_edge("location_inference", "filter")
-    g.add_edge("filter",             "sentiment5")
+    g.add_edge("filter",             "sampler")
+    g.add_edge("sampler",            "sentiment5")
     g.add_edge("sentiment5",         "sentiment3")
     g.add_edge("sentiment3",         "topics")
     g.add_edge("topics",             "merge")
     g.add_edge("merge",              "report")
+    # --sample-grow: the reporter may send us back for a bigger sample
+    g.add_conditional_edges("report", lambda s: "sampler" if s.get("sample_more") else END)
 
     g.set_entry_point("collector")
     return g.compile()
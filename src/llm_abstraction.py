@@ -5,12 +5,14 @@ Back-ends:
   • Hugging-Face local / HF Inference
   • Meta Llama API  (https://llama.developer.meta.com)
 Handles RPM/TPM/RPD/TPD buckets, Retry-After ('4.8s', '120ms'), and fallback.
+The "router" alias load-balances over several back-ends / API keys.
 """
 
 from __future__ import annotations
 from typing import Optional
-import os, re, time, random, logging, json, requests
+import os, re, time, random, logging, json, threading, requests
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from typing import Dict
 from packaging import version
 from openai import RateLimitError
@@ -63,11 +65,11 @@ class BaseLLM(ABC):
 # ── OpenAI client ───────────────────────────────────────────────────────────
 class OpenAIClient(BaseLLM):
     name = "openai"
-    def __init__(self, model: str):
+    def __init__(self, model: str, api_key: str | None = None):
         import openai
         self.model   = model
         self.legacy  = version.parse(openai.__version__) < version.parse("1.0.0")
-        key = os.getenv("OPENAI_API_KEY") or ""
+        key = api_key or os.getenv("OPENAI_API_KEY") or ""
         if not key: raise RuntimeError("OPENAI_API_KEY not set")
         if self.legacy:
             openai.api_key = key
@@ -142,27 +144,35 @@ class HFClient(BaseLLM):
                      "neutral": 0,
                      "positive": 1, "very positive": 2}
 
+    def _norm(self, label: str):
+        label = label.lower()
+        if label in self.map5: return self.map5[label]
+        if label in self.map3: return self.map3[label]
+        return label                            # raw, unmapped
+
     def generate(self, text: str, **kw) -> str:
         # strip generation-only args
         for k in ("temperature", "top_p", "top_k", "max_tokens"):
             kw.pop(k, None)
 
         res = self.pipe(text, **kw)[0]          # {'label': 'positive', 'score': 0.98}
-        label = res["label"].lower()
+        score = self._norm(res["label"])
+        if isinstance(score, int):
+            return json.dumps({"score": score, "prob": res["score"]})
+        return json.dumps({"label": score})     # fallback raw
 
-        if label in self.map5:
-            return json.dumps({"score": self.map5[label]})
-        if label in self.map3:
-            return json.dumps({"score": self.map3[label]})
-        return json.dumps({"label": label})     # fallback raw
+    def classify(self, texts: list[str], batch_size: int = 32) -> list[tuple]:
+        """Batched forward pass → [(score or raw label, probability), …]."""
+        res = self.pipe(texts, batch_size=batch_size, truncation=True)
+        return [(self._norm(r["label"]), float(r["score"])) for r in res]
 
 # ── Meta official Llama API ─────────────────────────────────────────────────
 class LlamaMetaClient(BaseLLM):
     name = "llama-meta"
     ENDPOINT = "https://api.meta.ai/v1/chat/completions"
-    def __init__(self, model:str):
+    def __init__(self, model:str, api_key:str|None=None):
         self.model = model or "Llama-3.3-70B-Instruct"
-        self.key   = os.getenv("LLAMA_API_KEY") or ""
+        self.key   = api_key or os.getenv("LLAMA_API_KEY") or ""
         if not self.key: raise RuntimeError("LLAMA_API_KEY not set")
     def generate(self, prompt, temperature=0.2, **kw):
         start=time.perf_counter()
@@ -180,12 +190,172 @@ class LlamaMetaClient(BaseLLM):
         txt=r.json()["choices"][0]["message"]["content"].strip()
         self._log(start,prompt,txt); return txt
 
+# ── multi-key / multi-backend router ───────────────────────────────────────
+KEY_ENVS = {OpenAIClient: "OPENAI_API_KEY", LlamaMetaClient: "LLAMA_API_KEY"}
+
+def _env_keys(name: str) -> list[str]:
+    """Comma-separated <NAME>S (e.g. OPENAI_API_KEYS), else the single <NAME>."""
+    keys = [k.strip() for k in (os.getenv(name + "S") or "").split(",") if k.strip()]
+    return keys or [os.getenv(name) or ""]
+
+def _status(e: Exception) -> int | None:
+    resp = getattr(e, "response", None)
+    return getattr(resp, "status_code", None) or getattr(e, "status_code", None)
+
+def _retryable(e: Exception) -> bool:
+    """
+    False for a bad *request* (400, 404, 413, 422 …) that no other back-end
+    would accept either. 401/403 (this key), 408/429 and 5xx stay retryable.
+    """
+    if isinstance(e, RateLimitError):
+        return True
+    status = _status(e)
+    return not (status and 400 <= status < 500 and status not in (401, 403, 408, 429))
+
+class _Slot:
+    """One (backend, api-key) pair plus its health stats."""
+    def __init__(self, label: str, client: BaseLLM, weight: float):
+        self.label, self.client, self.weight = label, client, weight
+        self.latency  = 2.0        # EWMA seconds, optimistic prior
+        self.cooldown = 0.0        # monotonic deadline while throttled / failing
+        self.fails    = 0
+        self.inflight = 0
+
+    def score(self) -> float:
+        return self.weight / (self.latency * (1 + self.inflight))
+
+class RouterClient(BaseLLM):
+    """
+    Weighted, latency- and quota-aware load balancer over several back-ends.
+
+    Env:
+      ASTRA_ROUTER_BACKENDS  "gpt-4o-mini:3,gpt-4.1:1"  alias[:weight], comma-sep
+      OPENAI_API_KEYS / LLAMA_API_KEYS                   one slot per key
+      ASTRA_HEDGE            hedge after N× slot EWMA latency (0 = off)
+    Throttled slots (per `_bucket`) sit out until their reset; errors back off.
+    """
+    name = "router"
+    ALPHA, MAX_BACKOFF = 0.2, 60.0
+
+    def __init__(self, model: str = "router"):
+        spec = os.getenv("ASTRA_ROUTER_BACKENDS") or "gpt-4o-mini"
+        self.slots: list[_Slot] = []
+        for item in spec.split(","):
+            alias, _, w = item.strip().partition(":")
+            key = ALIASES.get(alias.lower(), alias.lower())
+            cls = CLIENTS.get(key)
+            if cls is None or cls is RouterClient:
+                raise ValueError(f"Router: unknown backend '{alias}'")
+            weight = float(w or 1)
+            if cls in KEY_ENVS:
+                keys = _env_keys(KEY_ENVS[cls])
+                for i, k in enumerate(keys):
+                    self.slots.append(_Slot(f"{alias}#{i}", cls(alias, api_key=k), weight))
+            else:
+                self.slots.append(_Slot(alias, get_client(alias), weight))
+        self.hedge = float(os.getenv("ASTRA_HEDGE") or 0)
+        self.lock  = threading.Lock()
+        self.pool  = ThreadPoolExecutor(max_workers=max(2, 2 * len(self.slots)))
+        logging.info("Router: %d slots (%s)", len(self.slots),
+                     ", ".join(s.label for s in self.slots))
+
+    # ── selection & health ─────────────────────────────────────────────────
+    def _pick(self, exclude=()) -> _Slot | None:
+        now = time.monotonic()
+        with self.lock:
+            live = [s for s in self.slots if s.cooldown <= now and s not in exclude]
+            if not live:
+                return None
+            slot = random.choices(live, weights=[s.score() for s in live])[0]
+            slot.inflight += 1
+            return slot
+
+    def _throttled(self, slot: _Slot, e: Exception):
+        resp = getattr(e, "response", None)
+        bucket, reset = _bucket(resp)
+        hdr  = _retry_after_to_s(resp.headers.get("retry-after") if resp is not None else None)
+        hold = hdr or reset or (3600.0 if bucket in ("RPD", "TPD") else 20.0)
+        with self.lock:
+            slot.cooldown = time.monotonic() + hold
+        logging.warning("Router: %s throttled (%s) → out %.1fs", slot.label, bucket, hold)
+
+    def _failed(self, slot: _Slot, e: Exception):
+        with self.lock:
+            slot.fails += 1
+            hold = min(2.0 * 2 ** (slot.fails - 1), self.MAX_BACKOFF)
+            slot.cooldown = time.monotonic() + hold
+        logging.warning("Router: %s err %s → out %.1fs", slot.label, e, hold)
+
+    def _run(self, slot: _Slot, prompt, temperature, kw) -> str:
+        start = time.perf_counter()
+        try:
+            if isinstance(slot.client, OpenAIClient):   # single shot, no inner retries
+                txt = slot.client._call(prompt, temperature, **kw)
+            else:
+                txt = slot.client.generate(prompt, temperature=temperature, **kw)
+        except Exception as e:
+            if not _retryable(e):                      # request's fault, slot is fine
+                raise
+            (self._throttled if isinstance(e, RateLimitError) or _status(e) == 429
+             else self._failed)(slot, e)
+            raise
+        else:
+            dt = time.perf_counter() - start
+            with self.lock:
+                slot.latency = (1 - self.ALPHA) * slot.latency + self.ALPHA * dt
+                slot.fails   = 0
+            return txt
+        finally:
+            with self.lock:
+                slot.inflight -= 1
+
+    # ── public API ─────────────────────────────────────────────────────────
+    def _attempt(self, primary: _Slot, prompt, temperature, kw) -> str:
+        futs = [self.pool.submit(self._run, primary, prompt, temperature, kw)]
+        if self.hedge:
+            done, _ = wait(futs, timeout=self.hedge * primary.latency)
+            if not done:
+                backup = self._pick(exclude=(primary,))
+                if backup:
+                    logging.info("Router: hedging %s with %s", primary.label, backup.label)
+                    futs.append(self.pool.submit(self._run, backup, prompt, temperature, kw))
+        err = None
+        while futs:
+            done, pending = wait(futs, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    return f.result()        # losers finish in background
+                err = f.exception()
+                if not _retryable(err):
+                    raise err
+            futs = list(pending)
+        raise err
+
+    def generate(self, prompt, temperature=0.2, **kw):
+        start, max_try, err = time.perf_counter(), 2 * len(self.slots) + 3, None
+        for _ in range(max_try):
+            slot = self._pick()
+            if slot is None:
+                with self.lock:
+                    nxt = min(s.cooldown for s in self.slots) - time.monotonic()
+                time.sleep(min(max(nxt, 0.1), self.MAX_BACKOFF) + random.uniform(0, 1))
+                continue
+            try:
+                txt = self._attempt(slot, prompt, temperature, kw)
+                self._log(start, prompt, txt); return txt
+            except Exception as e:
+                if not _retryable(e):
+                    raise
+                err = e
+        raise RuntimeError("Router: all backends failed") from err
+
 # ── factory + alias table ──────────────────────────────────────────────────
 CLIENTS = {
     "gpt-4o":OpenAIClient,"gpt-4o-mini":OpenAIClient,"gpt-4":OpenAIClient, "gpt-4.1":OpenAIClient, "o4-mini": OpenAIClient,
     "gpt-3.5":OpenAIClient,"openai":OpenAIClient,
     "local":HFClient, "hf-sentiment": HFClient,
-    "llama-meta":LlamaMetaClient
+    "llama-meta":LlamaMetaClient,
+    "router":RouterClient,
 }
 ALIASES = {
     "mini":"gpt-4o-mini","4o":"gpt-4o","4.1":"gpt-4.1", "o4-mini": "o4-mini",
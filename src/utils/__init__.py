@@ -1 +1,2 @@
-from .json_utils import safe_extract
\ No newline at end of file
+from .json_utils import safe_extract
+from .loader import load_jsonl
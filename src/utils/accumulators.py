@@ -0,0 +1,184 @@
+"""
+Mergeable streaming accumulators for the report stage.
+
+Annotators fold their predictions in as they finish; the reporter reads
+macro P/R/F1, per-location tables, cascade tier stats and top topics from
+here instead of from the full merged frame, so it needs memory in the
+number of locations / topics, not posts. Accumulators serialise to JSON
+and `merge` across shards or resumed runs.
+"""
+
+from __future__ import annotations
+import heapq, json, math
+from collections import Counter, defaultdict
+from pathlib import Path
+
+LABELS = ("positive", "neutral", "negative")
+
+def _clean(v):
+    """NaN / None / "" → None, strings lower-cased (matches pandas .str.lower())."""
+    if v is None or (isinstance(v, float) and math.isnan(v)) or v == "":
+        return None
+    return v.lower() if isinstance(v, str) else v
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters sketch (Metwally et al.) with `capacity` slots.
+    Exact while the number of distinct items stays below capacity. The
+    minimum is found through a lazy min-heap (stale entries are skipped on
+    pop), so updates are amortised O(log capacity).
+    """
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+        self._heap: list[tuple[int, str]] = []
+
+    def _rebuild(self):
+        self._heap = [(n, item) for item, n in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_min(self) -> int:
+        while True:
+            n, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == n:       # live entry, not a stale one
+                del self.counts[item]
+                return n
+
+    def update(self, item: str, n: int = 1):
+        if item in self.counts:
+            self.counts[item] += n
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = n
+        else:
+            self.counts[item] = self._pop_min() + n
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild()
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        for item, n in other.counts.items():
+            self.counts[item] = self.counts.get(item, 0) + n
+        if len(self.counts) > self.capacity:
+            self.counts = dict(Counter(self.counts).most_common(self.capacity))
+        self._rebuild()
+        return self
+
+    def most_common(self, n: int) -> list[tuple[str, int]]:
+        return Counter(self.counts).most_common(n)
+
+class ReportAccumulator:
+    """
+    Confusion counts per (scheme, location) and per (scheme, cascade tier),
+    plus a topic sketch. `scheme` is "5pt" (mapped to 3 labels) or "3pt".
+    Unlabelled posts are kept (truth None) so metrics match the frame-based
+    `_macro`, which also counts them as false positives.
+    """
+    def __init__(self, topic_capacity: int = 1024):
+        self.conf  = defaultdict(Counter)     # (scheme, loc)  → Counter[(true, pred)]
+        self.tiers = defaultdict(Counter)     # (scheme, tier) → Counter[(true, pred)]
+        self.topics = SpaceSaving(topic_capacity)
+
+    # ── updates ────────────────────────────────────────────────────────────
+    def observe(self, scheme: str, location, label, pred, tier: str | None = None):
+        key = (_clean(label), _clean(pred))
+        loc = None if location is None or (isinstance(location, float) and math.isnan(location)) else location
+        self.conf[(scheme, loc)][key] += 1
+        if tier:
+            self.tiers[(scheme, tier)][key] += 1
+
+    def observe_topics(self, topics):
+        for t in topics if isinstance(topics, list) else ():
+            self.topics.update(str(t))
+
+    def merge(self, other: "ReportAccumulator") -> "ReportAccumulator":
+        for k, c in other.conf.items():
+            self.conf[k].update(c)
+        for k, c in other.tiers.items():
+            self.tiers[k].update(c)
+        self.topics.merge(other.topics)
+        return self
+
+    # ── reads ──────────────────────────────────────────────────────────────
+    @property
+    def n_posts(self) -> int:
+        per_scheme = Counter()
+        for (scheme, _), c in self.conf.items():
+            per_scheme[scheme] += sum(c.values())
+        return max(per_scheme.values(), default=0)
+
+    def locations(self) -> list:
+        return sorted({loc for _, loc in self.conf if loc is not None}, key=str)
+
+    def _counts(self, scheme: str, location=...) -> Counter:
+        if location is not ...:
+            return self.conf.get((scheme, location), Counter())
+        total = Counter()
+        for (s, _), c in self.conf.items():
+            if s == scheme:
+                total.update(c)
+        return total
+
+    def macro(self, scheme: str, location=...) -> dict:
+        c = self._counts(scheme, location)
+        prec = rec = f1 = 0
+        for lab in LABELS:
+            tp = c[(lab, lab)]
+            fp = sum(n for (t, p), n in c.items() if p == lab and t != lab)
+            fn = sum(n for (t, p), n in c.items() if t == lab and p != lab)
+            p  = tp / (tp + fp) if tp + fp else 0
+            r  = tp / (tp + fn) if tp + fn else 0
+            f  = 2*p*r/(p+r) if p+r else 0
+            prec += p; rec += r; f1 += f
+        n = len(LABELS)
+        return {"precision": round(prec/n,3),
+                "recall":    round(rec/n,3),
+                "f1":        round(f1/n,3)}
+
+    def hits(self, scheme: str, location=...) -> tuple[int, int]:
+        """(correct, labelled) for accuracy / Wilson intervals."""
+        c = self._counts(scheme, location)
+        lab = sum(n for (t, _), n in c.items() if t is not None)
+        return sum(n for (t, p), n in c.items() if t is not None and t == p), lab
+
+    def cascade(self, scheme: str) -> dict | None:
+        tiers = {t: c for (s, t), c in self.tiers.items() if s == scheme}
+        if not tiers:
+            return None
+        total = sum(sum(c.values()) for c in tiers.values())
+        out = {"escalation_rate": round(sum(tiers.get("llm", Counter()).values()) / total, 3)}
+        for tier in ("local", "llm"):
+            c = tiers.get(tier, Counter())
+            ok  = sum(n for (t, p), n in c.items() if t is not None and t == p)
+            lab = sum(n for (t, _), n in c.items() if t is not None)
+            out[f"accuracy_{tier}"] = round(ok / lab, 3) if lab else None
+            out[f"n_{tier}"] = sum(c.values())
+        return out
+
+    # ── (de)serialisation ──────────────────────────────────────────────────
+    def to_dict(self) -> dict:
+        return {
+            "conf":   [[s, loc, t, p, n] for (s, loc), c in self.conf.items()
+                       for (t, p), n in c.items()],
+            "tiers":  [[s, tier, t, p, n] for (s, tier), c in self.tiers.items()
+                       for (t, p), n in c.items()],
+            "topics": {"capacity": self.topics.capacity, "counts": self.topics.counts},
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ReportAccumulator":
+        acc = cls(d.get("topics", {}).get("capacity", 1024))
+        for s, loc, t, p, n in d.get("conf", []):
+            acc.conf[(s, loc)][(t, p)] += n
+        for s, tier, t, p, n in d.get("tiers", []):
+            acc.tiers[(s, tier)][(t, p)] += n
+        acc.topics.counts = dict(d.get("topics", {}).get("counts", {}))
+        acc.topics._rebuild()
+        return acc
+
+    def save(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(self.to_dict(), default=str))
+
+    @classmethod
+    def load(cls, path) -> "ReportAccumulator":
+        return cls.from_dict(json.loads(Path(path).read_text()))
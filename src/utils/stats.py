@@ -0,0 +1,47 @@
+"""
+Small statistics helpers for the --sample mode: sample sizing, Wilson score
+intervals and stratified bootstrap intervals.
+"""
+
+from __future__ import annotations
+import math
+import numpy as np
+
+Z95 = 1.96
+
+def sample_size(population: int, margin: float, z: float = Z95) -> int:
+    """Posts needed for a proportion CI of ±`margin` (worst case p=0.5, finite-pop corrected)."""
+    if population <= 0:
+        return 0
+    n0 = z * z * 0.25 / (margin * margin)
+    return min(population, math.ceil(n0 / (1 + (n0 - 1) / population)))
+
+def wilson(k: int, n: int, z: float = Z95) -> tuple[float, float]:
+    """Wilson score interval for k successes out of n."""
+    if n == 0:
+        return 0.0, 1.0
+    p      = k / n
+    denom  = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half   = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+def bootstrap_ci(stat, arrays, strata, n_boot: int = 200,
+                 alpha: float = 0.05, seed: int = 0) -> dict:
+    """
+    Percentile bootstrap for every key of `stat(*arrays) -> dict[str, float]`,
+    resampling within each stratum so strata keep their sample share.
+    Returns {key: (lo, hi)}.
+    """
+    rng    = np.random.default_rng(seed)
+    arrays = [np.asarray(a, dtype=object) for a in arrays]
+    strata = np.asarray(strata, dtype=object)
+    groups = [np.flatnonzero(strata == s) for s in dict.fromkeys(strata)]
+    draws: dict[str, list[float]] = {}
+    for _ in range(n_boot):
+        idx = np.concatenate([rng.choice(g, len(g)) for g in groups])
+        for k, v in stat(*(a[idx] for a in arrays)).items():
+            draws.setdefault(k, []).append(v)
+    return {k: (round(float(np.quantile(v, alpha / 2)), 3),
+                round(float(np.quantile(v, 1 - alpha / 2)), 3))
+            for k, v in draws.items()}